@@ -1,9 +1,40 @@
 import os
 import sys
-from collections import defaultdict
+from collections import Counter
 from pathlib import Path
 
 
+def iter_extensions(path):
+    """
+    Recursively yields the lowercased extension of every file under `path`,
+    taken straight from the os.scandir listings, so no Path is built per file.
+    Folders that can't be listed, and symlinked folders, contribute nothing to the counts.
+    """
+    stack = [path]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir():
+                    if not entry.is_symlink():
+                        stack.append(entry.path)
+                    continue
+
+                # Same rules as Path.suffix: a leading or trailing dot is not an extension
+                name = entry.name
+                i = name.rfind('.')
+                if 0 < i < len(name) - 1:
+                    extension = name[i:].lower()
+                else:
+                    # If there's no extension (e.g., "README" without ".md"), we can label it differently
+                    extension = "<no_extension>"
+
+                yield extension
+
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: python count_extensions.py <directory_path>")
@@ -14,20 +45,8 @@ def main():
         print(f"Error: '{directory_path}' is not a valid directory.")
         sys.exit(1)
 
-    # Dictionary (extension -> count)
-    ext_counts = defaultdict(int)
-
-    # Recursively walk through the directory
-    for root, dirs, files in os.walk(directory_path):
-        for file in files:
-            # Get the file extension using Path or os.path.splitext
-            extension = Path(file).suffix.lower()
-
-            # If there's no extension (e.g., "README" without ".md"), we can label it differently
-            if extension == "":
-                extension = "<no_extension>"
-
-            ext_counts[extension] += 1
+    # Counter (extension -> count), tallied in C from the recursive walk
+    ext_counts = Counter(iter_extensions(str(directory_path)))
 
     # Print results
     print(f"\nFile extension counts for '{directory_path}':")
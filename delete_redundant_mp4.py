@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import argparse
+import os
 from pathlib import Path
 
 
@@ -12,18 +13,43 @@ def delete_mp4_versions(root_dir: Path):
     total_deleted = 0
 
     # Search recursively for image files with .heic or .jpg extensions.
-    for image_file in root_dir.rglob("*"):
-        if image_file.is_file() and image_file.suffix.lower() in {".heic", ".jpg"}:
-            total_checked += 1
-            # Construct a potential mp4 file name in the same directory with the same stem.
-            mp4_candidate = image_file.with_suffix(".mp4")
-            if mp4_candidate.exists() and mp4_candidate.is_file():
-                try:
-                    mp4_candidate.unlink()
-                    print(f"Deleted: {mp4_candidate}")
-                    total_deleted += 1
-                except Exception as e:
-                    print(f"Failed to delete {mp4_candidate}: {e}")
+    stack = [str(root_dir)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue  # rglob also skipped unreadable directories
+        # One listing per directory: collect the image stems and the .mp4 files,
+        # and the mp4s to delete are simply the ones whose stem matches an image.
+        mp4s = {}
+        images = set()
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                    continue
+                if not entry.is_file():
+                    continue
+
+                name = entry.name
+                dot = name.rfind(".")
+                if dot <= 0:
+                    continue
+                ext = name[dot:]
+                if ext == ".mp4":
+                    mp4s[name[:dot]] = entry.path
+                elif ext.lower() in {".heic", ".jpg"}:
+                    total_checked += 1
+                    images.add(name[:dot])
+
+        for stem in images & mp4s.keys():
+            mp4_candidate = mp4s[stem]
+            try:
+                os.unlink(mp4_candidate)
+                print(f"Deleted: {mp4_candidate}")
+                total_deleted += 1
+            except Exception as e:
+                print(f"Failed to delete {mp4_candidate}: {e}")
 
     print(
         f"\nSummary: Checked {total_checked} image files and deleted {total_deleted} corresponding .mp4 files.")
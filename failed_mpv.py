@@ -5,6 +5,9 @@ import logging
 import argparse
 import subprocess
 import sys
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 #!/usr/bin/env python3
 
@@ -37,6 +40,7 @@ def convert_mov_to_mp4(mov_file: Path, mp4_file: Path) -> bool:
                 "-dn",                   # Disable data streams
                 "-c:v", "libx264",
                 "-preset", "fast",
+                "-threads", "2",         # Several conversions run side by side
                 "-pix_fmt", "yuv420p",
                 # Explicit filter chain (redundant with -pix_fmt but sometimes helps)
                 "-vf", "format=yuv420p",
@@ -54,34 +58,143 @@ def convert_mov_to_mp4(mov_file: Path, mp4_file: Path) -> bool:
         return False
 
 
-def copy_metadata(src_file: Path, dst_file: Path) -> bool:
+class ExifToolDaemon:
+    """
+    ExifTool kept running in stay_open mode (`-stay_open True -@ -`) for one pool thread,
+    which copies the tags of each retried video onto its MP4.
+    Requires ExifTool 12.10+ (for `${status}` in -echo3).
+    """
+
+    def __init__(self):
+        self.process = self._start()
+
+    @staticmethod
+    def _start() -> subprocess.Popen:
+        return subprocess.Popen(
+            ["exiftool", "-stay_open", "True", "-@", "-"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            encoding="utf-8",
+            errors="surrogateescape"
+        )
+
+    def run(self, args: list) -> tuple:
+        """
+        Runs a single ExifTool command (`args` without the leading "exiftool")
+        and returns (exit_status, output).
+        """
+        lines = []
+        for arg in args:
+            if "\n" in arg or "\r" in arg:
+                # Argfile lines can't hold newlines, but "#[CSTR]" lines accept C escapes
+                arg = "#[CSTR]" + arg.replace("\\", "\\\\").replace(
+                    "\r", "\\r").replace("\n", "\\n")
+            lines.append(arg)
+        # Echo the command's exit status after it has been processed
+        lines += ["-echo3", "${status}", "-execute"]
+
+        self.process.stdin.write("\n".join(lines) + "\n")
+        self.process.stdin.flush()
+
+        output = []
+        while True:
+            line = self.process.stdout.readline()
+            if not line:
+                raise RuntimeError("ExifTool exited unexpectedly")
+            line = line.rstrip("\n")
+            if line == "{ready}":
+                break
+            output.append(line)
+
+        status = output.pop() if output else ""
+        return (int(status) if status.isdigit() else 1), "\n".join(output)
+
+    def restart(self):
+        """
+        Replaces the ExifTool process, e.g. after it died, with a fresh one.
+        """
+        self.process.kill()
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass  # Unwritten arguments can't be flushed into a broken pipe
+        self.process.stdout.close()
+        self.process.wait()
+        self.process = self._start()
+
+    def close(self):
+        """
+        Tells ExifTool to leave stay_open mode and waits for it to exit.
+        """
+        if self.process.poll() is None:
+            self.process.stdin.write("-stay_open\nFalse\n")
+            self.process.stdin.close()
+            self.process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def copy_metadata(src_file: Path, dst_file: Path, daemon: ExifToolDaemon) -> bool:
     """
     Copies metadata from the source file to the destination file using ExifTool.
     """
     logger.info(f"Copying metadata from {src_file} to {dst_file}")
+    status, _ = daemon.run([
+        "-overwrite_original",
+        "-TagsFromFile", str(src_file),
+        "-All:All",
+        str(dst_file)
+    ])
+    if status != 0:
+        logger.error(
+            f"Metadata copy failed for {src_file} -> {dst_file}: ExifTool exit status {status}")
+        return False
+    return True
+
+
+# ExifTool daemons for the pool threads, one per thread (see _init_worker)
+_thread_state = threading.local()
+_worker_daemons = []
+
+
+def _init_worker():
+    """
+    ThreadPoolExecutor initializer: gives each worker thread its own ExifTool daemon.
+    """
+    _thread_state.daemon = ExifToolDaemon()
+    _worker_daemons.append(_thread_state.daemon)
+
+
+def process_one_mov(mov_file: Path, output_file: Path) -> bool:
+    """
+    Converts one .mov to .mp4 and copies its metadata, inside a pool thread.
+    Returns True if both steps succeeded.
+    """
+    if not convert_mov_to_mp4(mov_file, output_file):
+        logger.error(f"Conversion failed for {mov_file}")
+        return False
     try:
-        subprocess.run(
-            [
-                "exiftool",
-                "-overwrite_original",
-                "-TagsFromFile", str(src_file),
-                "-All:All",
-                str(dst_file)
-            ],
-            check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL
-        )
-        return True
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Metadata copy failed for {src_file} -> {dst_file}: {e}")
+        copied = copy_metadata(mov_file, output_file, _thread_state.daemon)
+    except (RuntimeError, BrokenPipeError):
+        # A dead ExifTool would fail every later video on this thread too
+        _thread_state.daemon.restart()
+        raise
+    if not copied:
+        logger.error(f"Metadata copy failed for {mov_file}")
         return False
+    logger.info(f"Successfully processed {mov_file}")
+    return True
 
 
 def process_failed_list(failed_list_file: Path, base_dir: Path, output_dir: Path):
     """
     Reads a text file containing failed .mov file paths (one per line), computes the relative path
     (so that folder structure is maintained) and converts each .mov to .mp4, copying metadata afterwards.
+    Conversions run concurrently, one ffmpeg per worker thread.
     """
     if not failed_list_file.exists():
         logger.error(f"Failed list file {failed_list_file} does not exist.")
@@ -93,32 +206,42 @@ def process_failed_list(failed_list_file: Path, base_dir: Path, output_dir: Path
     total = len(lines)
     success_count = 0
 
-    for file_str in lines:
-        mov_file = Path(file_str)
-        if not mov_file.exists():
-            logger.error(f"File does not exist: {mov_file}")
-            continue
+    # ffmpeg runs with "-threads 2", so half the cores worth of ffmpegs fills the machine
+    max_workers = max(1, min((os.cpu_count() or 2) // 2, total))
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers, initializer=_init_worker) as executor:
+            futures = {}
+            for file_str in lines:
+                mov_file = Path(file_str)
+                if not mov_file.exists():
+                    logger.error(f"File does not exist: {mov_file}")
+                    continue
 
-        try:
-            rel_path = mov_file.relative_to(base_dir)
-        except ValueError as e:
-            logger.error(
-                f"File {mov_file} is not under base directory {base_dir}: {e}")
-            continue
-
-        # Construct output file path with the same folder structure and .mp4 extension.
-        output_file = output_dir / rel_path
-        output_file = output_file.with_suffix(".mp4")
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-
-        if convert_mov_to_mp4(mov_file, output_file):
-            if copy_metadata(mov_file, output_file):
-                logger.info(f"Successfully processed {mov_file}")
-                success_count += 1
-            else:
-                logger.error(f"Metadata copy failed for {mov_file}")
-        else:
-            logger.error(f"Conversion failed for {mov_file}")
+                try:
+                    rel_path = mov_file.relative_to(base_dir)
+                except ValueError as e:
+                    logger.error(
+                        f"File {mov_file} is not under base directory {base_dir}: {e}")
+                    continue
+
+                # Construct output file path with the same folder structure and .mp4 extension.
+                output_file = output_dir / rel_path
+                output_file = output_file.with_suffix(".mp4")
+                output_file.parent.mkdir(parents=True, exist_ok=True)
+
+                future = executor.submit(process_one_mov, mov_file, output_file)
+                futures[future] = mov_file
+
+            for future in as_completed(futures):
+                try:
+                    if future.result():
+                        success_count += 1
+                except Exception as e:
+                    logger.error(f"Error processing {futures[future]}: {e}")
+    finally:
+        for daemon in _worker_daemons:
+            daemon.close()
+        _worker_daemons.clear()
 
     logger.info(
         f"Processed {success_count} out of {total} files successfully.")
@@ -1,17 +1,55 @@
 import os
 import shutil
 import argparse
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
 
 
-def build_filename_set(folder):
+def walk_files(folder):
     """
-    Recursively builds a set of file names (with extensions) present in the given folder.
+    Recursively yields a DirEntry for every file in the given folder, as listed by os.scandir.
+    A folder that can't be listed is skipped: for folder2 its names count as missing, so
+    same-named files in folder1 get copied. Symlinked folders aren't followed.
     """
-    filenames = set()
-    for dirpath, _, files in os.walk(folder):
-        for f in files:
-            filenames.add(f)
-    return filenames
+    stack = [folder]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir():
+                    if not entry.is_symlink():
+                        stack.append(entry.path)
+                else:
+                    yield entry
+
+
+class FilenameFilter:
+    """
+    Memory-compact membership test for a very large number of file names.
+    Only the names' hashes are kept, as 8-byte machine ints in a sorted array
+    (instead of a str object and a set slot per name), and looked up with bisect.
+    A name whose hash collides with one in the filter is wrongly reported present.
+    """
+
+    def __init__(self, names):
+        self.hashes = array('q', sorted(map(hash, names)))
+
+    def __contains__(self, name):
+        h = hash(name)
+        i = bisect_left(self.hashes, h)
+        return i < len(self.hashes) and self.hashes[i] == h
+
+
+def build_filename_filter(folder):
+    """
+    Recursively collects the file names (with extensions) present in the given folder
+    into a FilenameFilter.
+    """
+    return FilenameFilter(entry.name for entry in walk_files(folder))
 
 
 def compare_and_copy(folder1, folder2, output_folder):
@@ -19,24 +57,29 @@ def compare_and_copy(folder1, folder2, output_folder):
     Recursively scans folder1. For each file, if the filename (name and extension) is not found
     anywhere in folder2, copy the file to output_folder preserving metadata and directory structure.
     """
-    # Build a set of file names from folder2
-    folder2_filenames = build_filename_set(folder2)
+    # Scan both folders at the same time: the threads spend most of their time in
+    # directory-listing syscalls, which release the GIL.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        # Build a compact filter of file names from folder2
+        folder2_future = executor.submit(build_filename_filter, folder2)
+        folder1_future = executor.submit(lambda: list(walk_files(folder1)))
+        folder1_files = folder1_future.result()
+        folder2_filenames = folder2_future.result()
 
     # Ensure output_folder exists
     os.makedirs(output_folder, exist_ok=True)
 
-    # Walk folder1 and check if each file's name is in folder2_filenames
-    for dirpath, _, files in os.walk(folder1):
-        for f in files:
-            if f not in folder2_filenames:
-                src_path = os.path.join(dirpath, f)
-                # Preserve the relative path from folder1
-                rel_path = os.path.relpath(src_path, folder1)
-                dest_path = os.path.join(output_folder, rel_path)
-                dest_dir = os.path.dirname(dest_path)
-                os.makedirs(dest_dir, exist_ok=True)
-                # shutil.copy2(src_path, dest_path)  # copy2 preserves metadata
-                print(f"Copied: {src_path} -> {dest_path}")
+    # Check if each file's name from folder1 is in folder2_filenames
+    for entry in folder1_files:
+        if entry.name not in folder2_filenames:
+            src_path = entry.path
+            # Preserve the relative path from folder1
+            rel_path = os.path.relpath(src_path, folder1)
+            dest_path = os.path.join(output_folder, rel_path)
+            dest_dir = os.path.dirname(dest_path)
+            os.makedirs(dest_dir, exist_ok=True)
+            # shutil.copy2(src_path, dest_path)  # copy2 preserves metadata
+            print(f"Copied: {src_path} -> {dest_path}")
 
 
 if __name__ == "__main__":
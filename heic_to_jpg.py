@@ -3,18 +3,67 @@
 import os
 import sys
 import subprocess
+import multiprocessing.util
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+# Optional: decode HEIC in-process instead of spawning ImageMagick for every file
+try:
+    import pyheif
+    from PIL import Image, ExifTags
+except ImportError:
+    pyheif = None
+
+
+def exif_from_heif(heif) -> bytes:
+    """
+    Returns the Exif block of a decoded pyheif image in the form Pillow's
+    `exif=` save argument expects (with the "Exif" header), or b"" if there is none.
+    The Orientation tag is reset to 1, since pyheif has already applied the
+    HEIF rotation/mirroring (irot/imir) to the pixels.
+    """
+    for block in heif.metadata or []:
+        if block["type"] == "Exif":
+            data = block["data"]
+            # HEIF stores a 4-byte offset to the TIFF header (counted from the end
+            # of the offset itself) in front of the payload
+            offset = int.from_bytes(data[:4], "big")
+            tiff = data[4 + offset:]
+            if tiff.startswith(b"Exif\x00\x00"):
+                tiff = tiff[6:]
+            exif = Image.Exif()
+            try:
+                exif.load(b"Exif\x00\x00" + tiff)
+            except Exception:
+                return b""  # Unreadable; ExifTool still copies the tags it can parse
+            exif[ExifTags.Base.Orientation] = 1
+            return exif.tobytes()
+    return b""
+
 
 def convert_heic_to_jpg(heic_file: Path, jpg_file: Path) -> bool:
     """
-    Converts a .heic file to .jpg using `heif-convert` (from libheif).
-    Returns True if the command succeeds, otherwise False.
+    Converts a .heic file to .jpg in-process with pyheif (libheif) and Pillow,
+    carrying the Exif block over into the JPEG.
+    Returns True if the conversion succeeds, otherwise False.
 
-    If you have ImageMagick installed, comment out the `heif-convert`
-    line and uncomment the `magick convert` line below.
+    If pyheif/Pillow aren't installed, falls back to running `magick convert`
+    (ImageMagick) for each file.
     """
     print(f"[CONVERT] {heic_file.name} -> {jpg_file.name}")
+    if pyheif is not None:
+        try:
+            heif = pyheif.read(str(heic_file))
+            img = Image.frombytes(heif.mode, heif.size, heif.data,
+                                  "raw", heif.mode, heif.stride)
+            if img.mode != "RGB":
+                img = img.convert("RGB")  # JPEG has no alpha channel
+            img.save(jpg_file, "JPEG", quality=95, exif=exif_from_heif(heif))
+            return True
+        except Exception as e:
+            print(f"Error: Conversion failed on {heic_file} -> {e}")
+            return False
+
     try:
         # --- Using libheif ---
         # subprocess.run(
@@ -34,23 +83,153 @@ def convert_heic_to_jpg(heic_file: Path, jpg_file: Path) -> bool:
         return False
 
 
-def copy_metadata_from_heic_to_jpg(heic_file: Path, jpg_file: Path) -> bool:
+class ExifToolDaemon:
+    """
+    A long-running ExifTool (`-stay_open True -@ -`) for one pool worker, so copying
+    the tags of each converted HEIC is a pipe round trip rather than a new Perl process.
+    Requires ExifTool 12.10+ (for `${status}` in -echo3).
+    """
+
+    def __init__(self):
+        self.process = self._start()
+
+    @staticmethod
+    def _start() -> subprocess.Popen:
+        return subprocess.Popen(
+            ["exiftool", "-stay_open", "True", "-@", "-"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            encoding="utf-8",
+            errors="surrogateescape"
+        )
+
+    def run(self, args: list) -> tuple:
+        """
+        Runs a single ExifTool command (`args` without the leading "exiftool")
+        and returns (exit_status, output).
+        """
+        lines = []
+        for arg in args:
+            if "\n" in arg or "\r" in arg:
+                # Argfile lines can't hold newlines, but "#[CSTR]" lines accept C escapes
+                arg = "#[CSTR]" + arg.replace("\\", "\\\\").replace(
+                    "\r", "\\r").replace("\n", "\\n")
+            lines.append(arg)
+        # Echo the command's exit status after it has been processed
+        lines += ["-echo3", "${status}", "-execute"]
+
+        self.process.stdin.write("\n".join(lines) + "\n")
+        self.process.stdin.flush()
+
+        output = []
+        while True:
+            line = self.process.stdout.readline()
+            if not line:
+                raise RuntimeError("ExifTool exited unexpectedly")
+            line = line.rstrip("\n")
+            if line == "{ready}":
+                break
+            output.append(line)
+
+        status = output.pop() if output else ""
+        return (int(status) if status.isdigit() else 1), "\n".join(output)
+
+    def restart(self):
+        """
+        Replaces the ExifTool process, e.g. after it died, with a fresh one.
+        """
+        self.process.kill()
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass  # Unwritten arguments can't be flushed into a broken pipe
+        self.process.stdout.close()
+        self.process.wait()
+        self.process = self._start()
+
+    def close(self):
+        """
+        Tells ExifTool to leave stay_open mode and waits for it to exit.
+        """
+        if self.process.poll() is None:
+            self.process.stdin.write("-stay_open\nFalse\n")
+            self.process.stdin.close()
+            self.process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def copy_metadata_from_heic_to_jpg(heic_file: Path, jpg_file: Path, daemon: ExifToolDaemon) -> bool:
     """
     Copies metadata from the original .heic to the .jpg using ExifTool.
+    Orientation is left out: both decoders have already rotated the pixels.
     Returns True if successful, otherwise False.
     """
     print(f"[METADATA] Copying from {heic_file.name} to {jpg_file.name}")
+    status, output = daemon.run([
+        "-overwrite_original",
+        "-TagsFromFile", str(heic_file),
+        "-All:All",
+        "--Orientation",
+        str(jpg_file)
+    ])
+    if output:
+        print(output)
+    if status != 0:
+        print(f"Error: ExifTool failed to copy metadata -> exit status {status}")
+        return False
+    return True
+
+
+# This worker's ExifTool, started by _init_worker
+_worker_daemon = None
+
+
+def _init_worker():
+    """
+    ProcessPoolExecutor initializer: gives each worker process its own ExifTool daemon.
+    (pyheif/Pillow are imported with the module, so they are loaded once per worker too.)
+    """
+    global _worker_daemon
+    _worker_daemon = ExifToolDaemon()
+    # Registered as a multiprocessing finalizer, which (unlike atexit) runs when the worker exits
+    multiprocessing.util.Finalize(
+        _worker_daemon, _worker_daemon.close, exitpriority=10)
+
+
+def process_one_heic(file_path: Path) -> bool:
+    """
+    Converts one .heic to a .jpg next to it, copies the metadata and removes
+    the original, inside a pool worker. Returns True if every step succeeded.
+    """
+    # Construct the .jpg file path in the same directory
+    jpg_file = file_path.with_suffix(".jpg")
+
+    # 1) Convert the .heic to .jpg
+    if not convert_heic_to_jpg(file_path, jpg_file):
+        return False  # Skip metadata copy if conversion failed
+
+    # 2) Copy metadata from the original HEIC to the new JPG
     try:
-        subprocess.run([
-            "exiftool",
-            "-overwrite_original",
-            "-TagsFromFile", str(heic_file),
-            "-All:All",
-            str(jpg_file)
-        ], check=True)
+        copied = copy_metadata_from_heic_to_jpg(file_path, jpg_file, _worker_daemon)
+    except (RuntimeError, BrokenPipeError):
+        # ExifTool died on this HEIC (which is kept); start a new one for the next files
+        _worker_daemon.restart()
+        raise
+    if not copied:
+        # Optionally, remove the .jpg if metadata copy fails
+        return False
+
+    # 3) Remove the original .heic if everything succeeded
+    try:
+        file_path.unlink()
         return True
-    except subprocess.CalledProcessError as e:
-        print(f"Error: ExifTool failed to copy metadata -> {e}")
+    except Exception as e:
+        print(f"Warning: Could not remove {file_path} -> {e}")
         return False
 
 
@@ -58,6 +237,7 @@ def process_heic_in_place(root_dir: Path):
     """
     Recursively searches for .heic files in `root_dir`, converts them to .jpg,
     copies metadata, and removes the original .heic.
+    Files are converted in parallel by a pool of worker processes.
     """
     if not root_dir.is_dir():
         print(f"Error: '{root_dir}' is not a directory.")
@@ -66,37 +246,28 @@ def process_heic_in_place(root_dir: Path):
     print(
         f"\nStarting in-place HEIC -> JPG conversion in: {root_dir.resolve()}")
 
-    total_heic = 0
+    # fname[1:] so that a bare ".heic" (no stem) isn't matched, as with Path.suffix
+    heic_files = [Path(path) / fname
+                  for path, dirs, files in os.walk(root_dir)
+                  for fname in files if fname[1:].lower().endswith(".heic")]
+    total_heic = len(heic_files)
     converted = 0
     failures = []
 
-    for path, dirs, files in os.walk(root_dir):
-        for fname in files:
-            file_path = Path(path) / fname
-            if file_path.suffix.lower() == ".heic":
-                total_heic += 1
-
-                # Construct the .jpg file path in the same directory
-                jpg_file = file_path.with_suffix(".jpg")
-
-                # 1) Convert the .heic to .jpg
-                if not convert_heic_to_jpg(file_path, jpg_file):
-                    failures.append(str(file_path))
-                    continue  # Skip metadata copy if conversion failed
-
-                # 2) Copy metadata from the original HEIC to the new JPG
-                if not copy_metadata_from_heic_to_jpg(file_path, jpg_file):
-                    failures.append(str(file_path))
-                    # Optionally, remove the .jpg if metadata copy fails
-                    continue
-
-                # 3) Remove the original .heic if everything succeeded
-                try:
-                    file_path.unlink()
-                    converted += 1
-                except Exception as e:
-                    print(f"Warning: Could not remove {file_path} -> {e}")
-                    failures.append(str(file_path))
+    with ProcessPoolExecutor(initializer=_init_worker) as executor:
+        futures = {executor.submit(process_one_heic, file_path): file_path
+                   for file_path in heic_files}
+        for future in as_completed(futures):
+            file_path = futures[future]
+            try:
+                ok = future.result()
+            except Exception as e:
+                print(f"Error: Processing failed on {file_path} -> {e}")
+                ok = False
+            if ok:
+                converted += 1
+            else:
+                failures.append(str(file_path))
 
     # Print summary
     print("\n=== Conversion Summary ===")
@@ -5,9 +5,25 @@ import json
 import subprocess
 import sys
 from pathlib import Path
-import datetime
+import time
 import shutil
-from collections import defaultdict
+import multiprocessing.util
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+# orjson parses the JSON sidecars several times faster than json, when it's installed
+# (both accept the raw bytes of the file)
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+# Reflinks are a Linux ioctl; elsewhere copy_and_detect_jpeg skips straight to the fallbacks
+if sys.platform.startswith("linux"):
+    import fcntl
+else:
+    fcntl = None
 
 # Extensions we want to process
 SUPPORTED_MEDIA_EXTENSIONS = {
@@ -17,28 +33,161 @@ SUPPORTED_MEDIA_EXTENSIONS = {
 # The output root directory where processed files (with updated metadata) will go
 OUTPUT_DIRECTORY = Path("./output")  # <-- CHANGE if desired
 
+# ioctl request number for cloning a file (FICLONE from <linux/fs.h>)
+FICLONE = 0x40049409
 
-def is_jpeg(file_path: Path) -> bool:
+# Arguments every metadata update starts with (the file-specific tags are appended)
+_ET_PREFIX = ("-overwrite_original",)
+
+# Number of files handed to a worker process at a time
+WORKER_CHUNK_SIZE = 64
+
+
+def copy_and_detect_jpeg(src: Path, dst: Path) -> bool:
     """
-    Quick signature check for JPEG files.
-    JPEG files usually start with bytes 0xFF, 0xD8.
+    Copies src to dst along with its metadata (like shutil.copy2), keeping the data
+    inside the kernel: a reflink (O(1) copy-on-write clone on Btrfs/XFS) is tried
+    first, then os.copy_file_range, then a regular buffered copy.
+    Returns True if src starts with the JPEG signature (bytes 0xFF, 0xD8), which is
+    read from the same open file, so JPEG detection costs no extra open.
+    Raises shutil.SameFileError if dst is src, as copy2 does.
     """
-    if not file_path.exists():
-        return False
-    try:
-        with open(file_path, "rb") as f:
-            start_bytes = f.read(2)
-        return start_bytes == b'\xff\xd8'
-    except:
-        return False
+    # Unbuffered, so reading the signature moves the file position by exactly 2 bytes
+    with open(src, "rb", buffering=0) as s:
+        # Like copy2, refuse to copy a file onto itself (opening dst would truncate src)
+        src_stat = os.fstat(s.fileno())
+        try:
+            dst_stat = os.stat(dst)
+        except FileNotFoundError:
+            pass
+        else:
+            if (dst_stat.st_dev, dst_stat.st_ino) == (src_stat.st_dev, src_stat.st_ino):
+                raise shutil.SameFileError(f"{str(src)!r} and {str(dst)!r} are the same file")
+
+        with open(dst, "wb") as d:
+            is_jpg = s.read(2) == b'\xff\xd8'
+            s.seek(0)
+
+            copied = False
+            if fcntl is not None:
+                try:
+                    fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+                    copied = True
+                except OSError:
+                    pass  # Filesystem doesn't support reflinks
 
+            if not copied and hasattr(os, "copy_file_range"):
+                try:
+                    remaining = src_stat.st_size
+                    while remaining > 0:
+                        n = os.copy_file_range(s.fileno(), d.fileno(), remaining)
+                        if n == 0:
+                            break
+                        remaining -= n
+                    # Some filesystems (e.g. FUSE) return 0 early; a short copy falls back to copyfileobj
+                    copied = remaining == 0
+                except OSError:
+                    pass  # e.g. cross-device copy on older kernels
+
+            if not copied:
+                # Start over in case copy_file_range failed part way through
+                s.seek(0)
+                d.seek(0)
+                d.truncate()
+                shutil.copyfileobj(s, d, 1024 * 1024)
+
+    shutil.copystat(src, dst)
+    return is_jpg
+
+
+class ExifToolDaemon:
+    """
+    Keeps one ExifTool process alive (`-stay_open True -@ -`) so that each media
+    file doesn't pay the Perl startup cost of a fresh `exiftool` invocation.
+    Arguments are written to its stdin one per line, followed by `-execute`, and
+    ExifTool prints `{ready}` once the command has finished.
+    Requires ExifTool 12.10+ (for `${status}` in -echo3).
+    """
 
-def update_metadata_with_exiftool(media_file: Path, metadata: dict):
+    def __init__(self):
+        self.process = self._start()
+
+    @staticmethod
+    def _start() -> subprocess.Popen:
+        return subprocess.Popen(
+            ["exiftool", "-stay_open", "True", "-@", "-"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            encoding="utf-8",
+            errors="surrogateescape"
+        )
+
+    def run(self, args: list) -> tuple:
+        """
+        Runs a single ExifTool command (`args` without the leading "exiftool")
+        and returns (exit_status, output).
+        """
+        lines = []
+        for arg in args:
+            if "\n" in arg or "\r" in arg:
+                # Argfile lines can't hold newlines, but "#[CSTR]" lines accept C escapes
+                arg = "#[CSTR]" + arg.replace("\\", "\\\\").replace(
+                    "\r", "\\r").replace("\n", "\\n")
+            lines.append(arg)
+        # Echo the command's exit status after it has been processed
+        lines += ["-echo3", "${status}", "-execute"]
+
+        self.process.stdin.write("\n".join(lines) + "\n")
+        self.process.stdin.flush()
+
+        output = []
+        while True:
+            line = self.process.stdout.readline()
+            if not line:
+                raise RuntimeError("ExifTool exited unexpectedly")
+            line = line.rstrip("\n")
+            if line == "{ready}":
+                break
+            output.append(line)
+
+        status = output.pop() if output else ""
+        return (int(status) if status.isdigit() else 1), "\n".join(output)
+
+    def restart(self):
+        """
+        Replaces the ExifTool process, e.g. after it died, with a fresh one.
+        """
+        self.process.kill()
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass  # Unwritten arguments can't be flushed into a broken pipe
+        self.process.stdout.close()
+        self.process.wait()
+        self.process = self._start()
+
+    def close(self):
+        """
+        Tells ExifTool to leave stay_open mode and waits for it to exit.
+        """
+        if self.process.poll() is None:
+            self.process.stdin.write("-stay_open\nFalse\n")
+            self.process.stdin.close()
+            self.process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def update_metadata_with_exiftool(media_file: Path, metadata: dict, daemon: ExifToolDaemon):
     """
-    Calls ExifTool to write metadata into the media file.
+    Calls ExifTool (through the running `daemon`) to write metadata into the media file.
     `metadata` is a dictionary containing relevant fields extracted from the JSON sidecar.
     """
-    exiftool_args = ["exiftool", "-overwrite_original"]
+    exiftool_args = list(_ET_PREFIX)
 
     # 1. Extract a date/time from the JSON (often stored under 'photoTakenTime' or 'creationTime')
     photo_timestamp = metadata.get('photoTakenTime', {}).get('timestamp') \
@@ -46,13 +195,18 @@ def update_metadata_with_exiftool(media_file: Path, metadata: dict):
     if photo_timestamp:
         try:
             epoch_time = int(photo_timestamp)
-            utc_time = datetime.datetime.utcfromtimestamp(epoch_time)
-            date_str = utc_time.strftime("%Y:%m:%d %H:%M:%S")
+            # Format the UTC struct_time directly, no datetime object needed
+            t = time.gmtime(epoch_time)
+            # gmtime goes past year 9999, which EXIF dates (like datetime) can't hold
+            if not 1 <= t.tm_year <= 9999:
+                raise ValueError(f"year {t.tm_year} is out of range")
+            date_str = (f"{t.tm_year:04d}:{t.tm_mon:02d}:{t.tm_mday:02d} "
+                        f"{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}")
 
             exiftool_args.append(f"-DateTimeOriginal={date_str}")
             exiftool_args.append(f"-CreateDate={date_str}")
             exiftool_args.append(f"-ModifyDate={date_str}")
-        except ValueError:
+        except (ValueError, OverflowError, OSError):
             print(
                 f"Warning: Unable to parse timestamp {photo_timestamp} for {media_file}")
 
@@ -78,29 +232,105 @@ def update_metadata_with_exiftool(media_file: Path, metadata: dict):
     exiftool_args.append(str(media_file))
 
     print(f"Running ExifTool for: {media_file}")
-    subprocess.run(exiftool_args)
+    status, output = daemon.run(exiftool_args)
+    if status != 0:
+        print(f"Warning: ExifTool failed for {media_file}: {output}")
 
 
-def find_corresponding_json(media_file: Path):
+def find_corresponding_json(root: str, file_name: str, names_in_dir: set):
     """
     Google Takeout can produce JSON sidecars with various naming patterns:
       - File.jpg and File.jpg.json
       - File.jpg and File.json
-    This function attempts to find the JSON sidecar by checking typical patterns.
+    This function attempts to find the JSON sidecar by checking typical patterns
+    against `names_in_dir`, the names listed in the media file's directory `root`,
+    so no filesystem calls are needed. Returns the sidecar path or None.
     """
     # e.g., "IMG_1234.JPG" => "IMG_1234.JPG.json"
-    json_path_1 = media_file.with_suffix(media_file.suffix + ".json")
-    if json_path_1.exists():
-        return json_path_1
+    json_name = file_name + ".json"
+    if json_name in names_in_dir:
+        return os.path.join(root, json_name)
 
     # e.g., "IMG_1234.JPG" => "IMG_1234.json"
-    json_path_2 = media_file.with_suffix(".json")
-    if json_path_2.exists():
-        return json_path_2
+    json_name = file_name[:file_name.rfind('.')] + ".json"
+    if json_name in names_in_dir:
+        return os.path.join(root, json_name)
 
     return None
 
 
+# ExifTool daemon owned by the current pool worker (see _init_worker)
+_worker_daemon = None
+
+
+def _init_worker():
+    """
+    ProcessPoolExecutor initializer: gives each worker process its own ExifTool daemon.
+    """
+    global _worker_daemon
+    _worker_daemon = ExifToolDaemon()
+    # Pool workers don't run atexit handlers, but multiprocessing finalizers do run
+    multiprocessing.util.Finalize(
+        _worker_daemon, _worker_daemon.close, exitpriority=10)
+
+
+def process_one(file_path: Path, input_ext: str, json_sidecar, input_directory: Path,
+                output_root: Path) -> tuple:
+    """
+    Runs the whole pipeline for a single media file inside a pool worker:
+    copy to output_root, fix “fake HEIC” extensions, apply the JSON sidecar metadata.
+    `input_ext` (the lowercased extension) and `json_sidecar` (path or None) are
+    already worked out during the directory walk.
+    Returns (ok, input_ext, output_ext, error_message).
+    """
+    # Create a relative path to preserve the subdirectory structure
+    rel_path = file_path.relative_to(input_directory)
+    output_path = output_root / rel_path
+
+    try:
+        # Ensure the subdirectory exists in the output
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Copy the original file to output_path
+        is_jpg = copy_and_detect_jpeg(file_path, output_path)
+
+        # Potential rename if .heic but actually JPEG
+        final_ext = input_ext
+        if final_ext == ".heic" and is_jpg:
+            new_output_path = output_path.with_suffix(".jpg")
+            output_path.rename(new_output_path)
+            output_path = new_output_path
+            final_ext = ".jpg"
+
+        # 2) Parse the JSON sidecar metadata
+        if json_sidecar:
+            try:
+                with open(json_sidecar, "rb") as jf:
+                    metadata = json_loads(jf.read())
+                # Some Google JSON sidecars are arrays
+                if isinstance(metadata, list) and len(metadata) > 0:
+                    metadata = metadata[0]
+            except Exception as e:
+                print(
+                    f"Warning: Could not parse JSON {json_sidecar}: {e}")
+                metadata = {}
+        else:
+            metadata = {}
+
+        # 3) Update Exif metadata on the (possibly renamed) output file
+        try:
+            update_metadata_with_exiftool(output_path, metadata, _worker_daemon)
+        except (RuntimeError, BrokenPipeError):
+            # The daemon died; this file fails, but the worker's later files get a new one
+            _worker_daemon.restart()
+            raise
+
+        return True, input_ext, final_ext, None
+
+    except Exception as e:
+        return False, input_ext, None, str(e)
+
+
 def process_directory(input_directory: Path):
     """
     Recursively iterates over input_directory, finds media files, and:
@@ -108,6 +338,7 @@ def process_directory(input_directory: Path):
       2) Renames “fake HEIC” files to .jpg if detected,
       3) Reads the corresponding JSON sidecar (if any) and updates Exif metadata,
       4) Collects stats for a final report (written to OUTPUT_DIRECTORY/report.txt).
+    Files are processed in parallel by a pool of worker processes.
     """
     if not OUTPUT_DIRECTORY.exists():
         OUTPUT_DIRECTORY.mkdir(parents=True)
@@ -116,99 +347,97 @@ def process_directory(input_directory: Path):
     total_files = 0
     processed_files = 0
     failed_files = []  # List of file paths (or names) that failed
-    # We'll track how many times we have (input_ext -> output_ext)
-    extension_map = defaultdict(int)
-
-    for root, dirs, files in os.walk(input_directory):
-        for file_name in files:
-            file_path = Path(root) / file_name
-            input_ext = file_path.suffix.lower()
-
-            # Check if this file has an extension we want to process
-            if input_ext in SUPPORTED_MEDIA_EXTENSIONS:
-                total_files += 1
-
-                # Create a relative path to preserve the subdirectory structure
-                rel_path = file_path.relative_to(input_directory)
-                output_path = OUTPUT_DIRECTORY / rel_path
-
-                # Ensure the subdirectory exists in the output
-                output_path.parent.mkdir(parents=True, exist_ok=True)
-
-                try:
-                    # Copy the original file to output_path
-                    shutil.copy2(file_path, output_path)
-
-                    # Potential rename if .heic but actually JPEG
-                    final_ext = output_path.suffix.lower()
-                    if final_ext == ".heic" and is_jpeg(output_path):
-                        new_output_path = output_path.with_suffix(".jpg")
-                        output_path.rename(new_output_path)
-                        output_path = new_output_path
-                        final_ext = ".jpg"
-
-                    # 2) Find JSON sidecar and parse metadata
-                    json_sidecar = find_corresponding_json(file_path)
-                    if json_sidecar and json_sidecar.exists():
-                        try:
-                            with open(json_sidecar, "r", encoding="utf-8") as jf:
-                                metadata = json.load(jf)
-                            # Some Google JSON sidecars are arrays
-                            if isinstance(metadata, list) and len(metadata) > 0:
-                                metadata = metadata[0]
-                        except Exception as e:
-                            print(
-                                f"Warning: Could not parse JSON {json_sidecar}: {e}")
-                            metadata = {}
-                    else:
-                        metadata = {}
-
-                    # 3) Update Exif metadata on the (possibly renamed) output file
-                    update_metadata_with_exiftool(output_path, metadata)
-                    processed_files += 1
-
-                    # Record the input -> output extension relationship
-                    extension_map[(input_ext, final_ext)] += 1
-
-                except Exception as e:
-                    print(f"Error processing {file_path}: {e}")
-                    failed_files.append(str(file_path))
+    # (input_ext, output_ext) of every processed file, tallied once at the end
+    extension_pairs = []
+
+    # Collect every file with an extension we want to process, along with its sidecar
+    media_files = []
+    media_exts = []
+    media_sidecars = []
+    stack = [str(input_directory)]
+    while stack:
+        root = stack.pop()
+        try:
+            with os.scandir(root) as it:
+                entries = list(it)
+        except OSError:
+            continue  # Unreadable folder: none of its media make it into the report
+
+        # Sidecars are resolved against this listing instead of probing the disk
+        names_in_dir = {entry.name for entry in entries}
+        for entry in entries:
+            if entry.is_dir():
+                # A symlinked folder would copy the same photos into OUTPUT_DIRECTORY twice
+                if not entry.is_symlink():
+                    stack.append(entry.path)
+                continue
+
+            # Filter on plain string ops, so rejected files never get a Path
+            # (a leading dot alone, e.g. ".jpg", is not an extension, as with Path.suffix)
+            file_name = entry.name
+            i = file_name.rfind('.')
+            if i <= 0:
+                continue
+            ext = file_name[i:].lower()
+            if ext not in SUPPORTED_MEDIA_EXTENSIONS:
+                continue
+            media_files.append(Path(entry.path))
+            media_exts.append(ext)
+            media_sidecars.append(
+                find_corresponding_json(root, file_name, names_in_dir))
+    total_files = len(media_files)
+
+    worker = partial(process_one, input_directory=input_directory,
+                     output_root=OUTPUT_DIRECTORY)
+    with ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=_init_worker) as executor:
+        # Large chunks amortize the IPC cost of handing files to the workers
+        results = executor.map(worker, media_files, media_exts, media_sidecars,
+                               chunksize=WORKER_CHUNK_SIZE)
+        for file_path, (ok, input_ext, final_ext, error) in zip(media_files, results):
+            if ok:
+                processed_files += 1
+                # Record the input -> output extension relationship
+                extension_pairs.append((input_ext, final_ext))
+            else:
+                print(f"Error processing {file_path}: {error}")
+                failed_files.append(str(file_path))
+
+    # How many times we have (input_ext -> output_ext)
+    extension_map = Counter(extension_pairs)
 
     # ---------------------------
     # Generate the final report
     # ---------------------------
-    report_lines = []
-    report_lines.append("=== FINAL REPORT ===\n")
-    report_lines.append(f"Input Directory : {input_directory.resolve()}")
-    report_lines.append(f"Output Directory: {OUTPUT_DIRECTORY.resolve()}\n")
-
-    report_lines.append(f"Total media files found : {total_files}")
-    report_lines.append(f"Successfully processed  : {processed_files}")
-    report_lines.append(
-        f"Failed                : {total_files - processed_files}\n")
-
-    # Summarize extension changes
-    report_lines.append(
-        "File type comparison (input_ext -> output_ext: count):")
-    for (in_ext, out_ext), count in sorted(extension_map.items()):
-        report_lines.append(f"  {in_ext} -> {out_ext} : {count}")
-    report_lines.append("")
-
-    # List failed files if any
-    if failed_files:
-        report_lines.append("Files that failed to process:")
-        for f in failed_files:
-            report_lines.append(f"  {f}")
-    else:
-        report_lines.append("No files failed.\n")
-
-    report_text = "\n".join(report_lines)
-    print("\n" + report_text)
-
-    # Write the report to a text file in the output directory
+    # Each line goes straight to the console and to OUTPUT_DIRECTORY/report.txt,
+    # so a huge failure list is never held in memory as one big string.
     report_path = OUTPUT_DIRECTORY / "report.txt"
+    print()
     with open(report_path, "w", encoding="utf-8") as rf:
-        rf.write(report_text)
+        def report(line):
+            print(line)
+            rf.write(line + "\n")
+
+        report("=== FINAL REPORT ===\n")
+        report(f"Input Directory : {input_directory.resolve()}")
+        report(f"Output Directory: {OUTPUT_DIRECTORY.resolve()}\n")
+
+        report(f"Total media files found : {total_files}")
+        report(f"Successfully processed  : {processed_files}")
+        report(f"Failed                : {total_files - processed_files}\n")
+
+        # Summarize extension changes
+        report("File type comparison (input_ext -> output_ext: count):")
+        for (in_ext, out_ext), count in sorted(extension_map.items()):
+            report(f"  {in_ext} -> {out_ext} : {count}")
+        report("")
+
+        # List failed files if any
+        if failed_files:
+            report("Files that failed to process:")
+            for f in failed_files:
+                report(f"  {f}")
+        else:
+            report("No files failed.\n")
 
     print(f"Report written to: {report_path.resolve()}")
 
@@ -223,6 +452,11 @@ def main():
         print(f"Error: {input_directory} is not a valid directory.")
         sys.exit(1)
 
+    # Every worker starts an ExifTool daemon, so check for it before starting the pool
+    if shutil.which("exiftool") is None:
+        print("Error: exiftool not found in PATH. Please install it and add it to your PATH.")
+        sys.exit(1)
+
     process_directory(input_directory)
 
 
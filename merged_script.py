@@ -1,15 +1,18 @@
 #!/usr/bin/env python3
 import os
+import io
 import sys
+import errno
+import stat
 import json
 import subprocess
 import argparse
+import asyncio
 import logging
 import datetime
 import shutil
 from pathlib import Path
-from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import Counter
 
 # For image handling (if needed for non-conversion operations)
 try:
@@ -18,10 +21,41 @@ except ImportError:
     print("Error: Pillow is not installed. Please run 'pip install Pillow' and try again.")
     sys.exit(1)
 
+# Optional: pillow-heif lets Pillow decode HEIC in-process instead of spawning ImageMagick
+try:
+    import pillow_heif
+    pillow_heif.register_heif_opener()
+except ImportError:
+    pillow_heif = None
+
+# Sidecars are parsed with orjson when it's installed; json_loads takes the file's bytes either way
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+# Optional: piexif writes the JSON metadata of JPEGs in-process instead of through ExifTool
+try:
+    import piexif
+except ImportError:
+    piexif = None
+
+# Reflinks are a Linux ioctl; elsewhere fast_copy skips straight to the fallbacks
+if sys.platform.startswith("linux"):
+    import fcntl
+else:
+    fcntl = None
+
+# On Linux, where shutil.copystat amounts to times, mode and xattrs, fast_copy sets those
+# through the open file descriptors instead (elsewhere copystat also copies e.g. BSD flags)
+COPYSTAT_BY_FD = sys.platform.startswith("linux")
+
 # --------------------------
 # Logging Configuration
 # --------------------------
-logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(levelname)s")
+# Per-file messages are logged at DEBUG level (shown with --verbose); at the default
+# INFO level a run only logs progress every PROGRESS_EVERY files, problems and the summary
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
 
 # --------------------------
@@ -30,22 +64,95 @@ logger = logging.getLogger(__name__)
 # Files that are acceptable either for copy or conversion.
 SUPPORTED_MEDIA_EXTENSIONS = {'.jpg', '.jpeg',
                               '.png', '.mp4', '.mov', '.heic', '.avi', '.gif'}
+# The same extensions without the leading dot, for filtering raw file names
+MEDIA_EXTS = frozenset(e[1:] for e in SUPPORTED_MEDIA_EXTENSIONS)
+
+# x264 presets accepted by --preset; "veryfast" encodes much faster than "fast"
+# at the same CRF with hardly any visible difference
+X264_PRESETS = ("ultrafast", "superfast", "veryfast", "faster", "fast",
+                "medium", "slow", "slower", "veryslow")
+DEFAULT_X264_PRESET = "veryfast"
+
+# Hardware H.264 encoders, in order of preference, with their rate-control flags.
+# One of these takes the encode off the CPU entirely; libx264 is the fallback.
+HW_ENCODERS = {
+    "h264_videotoolbox": ["-q:v", "50"],      # Apple
+    "h264_nvenc": ["-b:v", "5M"],             # NVIDIA
+    "h264_qsv": ["-global_quality", "23"],    # Intel Quick Sync
+}
+
+# How many hardware encodes run at once: GPUs cap concurrent encoder sessions
+# (consumer NVIDIA cards at a handful), whatever the number of CPU cores
+HW_ENCODE_SLOTS = 2
+
+# ioctl request number for cloning a file (FICLONE from <linux/fs.h>)
+FICLONE = 0x40049409
+
+# External tools, looked up on PATH once rather than for every file (None if not installed);
+# main exits early if a required one is missing
+FFMPEG_BIN = shutil.which("ffmpeg")
+MAGICK_BIN = shutil.which("magick")
+EXIFTOOL_BIN = shutil.which("exiftool")
+
+# Format of EXIF date/time tags
+EXIF_DATE_FORMAT = "%Y:%m:%d %H:%M:%S"
+
+# Constant ExifTool arguments, as the bytes written to the daemon's stdin
+B_OVERWRITE = b"-overwrite_original"
+B_DATE_TIME_ORIGINAL = b"-DateTimeOriginal="
+B_CREATE_DATE = b"-CreateDate="
+B_MODIFY_DATE = b"-ModifyDate="
+B_FILE_MODIFY_DATE = b"-FileModifyDate="
+B_GPS_LATITUDE = b"-GPSLatitude="
+B_GPS_LONGITUDE = b"-GPSLongitude="
+B_IMAGE_DESCRIPTION = b"-ImageDescription="
+B_TAGS_FROM_FILE = b"-TagsFromFile"
+B_ALL_TAGS = b"-All:All"
+B_NOT_ORIENTATION = b"--Orientation"
+# Ends every command: echo its exit status once it has been processed, then run it
+B_STATUS_AND_EXECUTE = b"-echo3\n${status}\n-execute\n"
+
+# Output directories already created during this run, so each is only made once
+# (process_file runs on the event loop thread, so this needs no lock)
+CREATED_DIRS = set()
+
+# How many files are processed between progress messages
+PROGRESS_EVERY = 100
+
+# How many ExifTool commands are written to the daemon before reading results back
+EXIFTOOL_BATCH_SIZE = 64
 
 # --------------------------
 # Conversion Functions
 # --------------------------
 
 
-def convert_heic_to_jpg(heic_file: Path, jpg_file: Path) -> bool:
+def convert_heic_to_jpg(heic_file: str, jpg_file: str) -> bool:
     """
-    Converts a HEIC file to a JPEG using ImageMagick.
-    The '-auto-orient' flag ensures the resulting JPEG is rotated properly.
+    Converts a HEIC file to a JPEG in-process with Pillow and pillow-heif.
+    ImageOps.exif_transpose ensures the resulting JPEG is rotated properly, and the
+    Exif data and color profile are carried over.
+    Falls back to ImageMagick (with '-auto-orient') if pillow-heif isn't installed.
     """
-    logger.info(f"Converting HEIC: {heic_file} -> {jpg_file}")
+    logger.debug(f"Converting HEIC: {heic_file} -> {jpg_file}")
+    if pillow_heif is not None:
+        try:
+            with Image.open(heic_file) as img:
+                img = ImageOps.exif_transpose(img)
+                if img.mode != "RGB":
+                    img = img.convert("RGB")  # JPEG has no alpha channel
+                img.save(jpg_file, "JPEG", quality=92, optimize=True,
+                         exif=img.getexif().tobytes(),
+                         icc_profile=img.info.get("icc_profile"))
+            return True
+        except Exception as e:
+            logger.error(f"HEIC conversion failed for {heic_file}: {e}")
+            return False
+
     try:
         subprocess.run(
-            ["magick", "convert", str(heic_file),
-             "-auto-orient", str(jpg_file)],
+            [MAGICK_BIN, "convert", heic_file,
+             "-auto-orient", jpg_file],
             check=True
         )
         return True
@@ -54,278 +161,870 @@ def convert_heic_to_jpg(heic_file: Path, jpg_file: Path) -> bool:
         return False
 
 
-def convert_video_to_mp4(mov_file: Path, mp4_file: Path) -> bool:
+def detect_hw_encoder():
+    """
+    Returns the first hardware H.264 encoder from HW_ENCODERS that works on this
+    machine, or None. ffmpeg lists every encoder it was built with, so each listed
+    candidate is confirmed with a one-frame test encode.
+    """
+    if FFMPEG_BIN is None:
+        return None
+    try:
+        result = subprocess.run([FFMPEG_BIN, "-hide_banner", "-encoders"],
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    listed = {fields[1] for fields in map(str.split, result.stdout.splitlines())
+              if len(fields) > 1}
+
+    for encoder, rate_args in HW_ENCODERS.items():
+        if encoder not in listed:
+            continue
+        try:
+            subprocess.run(
+                [FFMPEG_BIN, "-hide_banner", "-f", "lavfi", "-i", "color=size=256x256:duration=0.1",
+                 "-frames:v", "1", "-c:v", encoder, *rate_args, "-pix_fmt", "yuv420p",
+                 "-f", "null", "-"],
+                check=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+        except (OSError, subprocess.CalledProcessError):
+            continue
+        logger.info(f"Using hardware video encoder: {encoder} (--preset only applies to libx264; "
+                    f"pass --no-hw-encoder to use it)")
+        return encoder
+    return None
+
+
+async def convert_video_to_mp4(mov_file: str, mp4_file: str, preset: str = DEFAULT_X264_PRESET,
+                               hw_encoder: str = None) -> bool:
     """
     Converts a .mov file to .mp4 using ffmpeg.
-    This version disables hardware acceleration, ignores unknown streams, disables data streams,
+    This version ignores unknown streams, disables data streams,
     and forces the pixel format to yuv420p to work around issues with extra metadata.
+    The video is encoded with `hw_encoder` (see detect_hw_encoder) when given, otherwise with
+    libx264, where quality is pinned with CRF 23 so `preset` only trades encoding speed for file size.
+    ffmpeg runs as an asyncio subprocess, so other files are processed while it encodes.
     """
-    if shutil.which("ffmpeg") is None:
-        logger.error(
-            "ffmpeg not found in PATH. Please install ffmpeg and add it to your PATH.")
-        return False
+    if hw_encoder:
+        video_args = ["-c:v", hw_encoder, *HW_ENCODERS[hw_encoder]]
+    else:
+        video_args = ["-c:v", "libx264", "-preset", preset, "-crf", "23"]
 
-    logger.info(f"Converting: {mov_file} -> {mp4_file}")
+    logger.debug(f"Converting: {mov_file} -> {mp4_file}")
     try:
-        subprocess.run(
-            [
-                "ffmpeg", "-y",
-                "-hwaccel", "none",
-                "-ignore_unknown",
-                "-i", str(mov_file),
-                "-map", "0:v:0",
-                "-map", "0:a:0",
-                "-dn",                   # Disable data streams
-                "-c:v", "libx264",
-                "-preset", "fast",
-                "-pix_fmt", "yuv420p",
-                # Explicit filter chain (redundant with -pix_fmt but sometimes helps)
-                "-vf", "format=yuv420p",
-                "-c:a", "aac",
-                "-strict", "experimental",
-                str(mp4_file)
-            ],
-            check=True,
+        process = await asyncio.create_subprocess_exec(
+            FFMPEG_BIN, "-y",
+            "-ignore_unknown",
+            "-i", mov_file,
+            "-map", "0:v:0",
+            "-map", "0:a:0",
+            "-dn",                   # Disable data streams
+            *video_args,
+            "-threads", "2",         # Several conversions run side by side
+            "-pix_fmt", "yuv420p",
+            "-c:a", "aac",
+            "-strict", "experimental",
+            "-movflags", "+faststart",  # moov atom at the front of the file
+            mp4_file,
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL
         )
-        return True
-    except subprocess.CalledProcessError as e:
+        returncode = await process.wait()
+    except OSError as e:
         logger.error(f"Failed to convert {mov_file} to MP4: {e}")
         return False
+    if returncode != 0:
+        logger.error(f"Failed to convert {mov_file} to MP4: ffmpeg exited with status {returncode}")
+        return False
+    return True
+
+# --------------------------
+# Copy Functions
+# --------------------------
+
+
+def fast_copy(src_file: str, dst_file: str, hardlink: bool = False):
+    """
+    Copies src_file to dst_file along with its metadata (like shutil.copy2), keeping
+    the data inside the kernel: a reflink (O(1) copy-on-write clone on Btrfs/XFS) is
+    tried first, then os.copy_file_range, then a regular buffered copy.
+    On Linux the metadata is set through the open files (see copystat_fd).
+    With hardlink=True, dst_file is made a hard link to src_file instead, unless they
+    are on different filesystems. ExifTool's -overwrite_original writes a new file
+    and renames it over the old one, so a metadata update never alters the source.
+    Like copy2, raises shutil.SameFileError if dst_file is src_file (the same path, or a
+    hard link to it left by an earlier --hardlink run), instead of truncating the source;
+    with hardlink=True such a dst_file is already what was asked for and is left alone.
+    """
+    with open(src_file, "rb") as s:
+        # One fstat serves the same-file check, the copy size and the metadata
+        src_stat = os.fstat(s.fileno())
+        try:
+            dst_stat = os.stat(dst_file)
+        except FileNotFoundError:
+            pass
+        else:
+            if (dst_stat.st_dev, dst_stat.st_ino) == (src_stat.st_dev, src_stat.st_ino):
+                if hardlink:
+                    return
+                raise shutil.SameFileError(f"{src_file!r} and {dst_file!r} are the same file")
+
+        if hardlink:
+            try:
+                os.link(src_file, dst_file)
+                return
+            except FileExistsError:
+                # Left over from an earlier run, which copy2 would simply overwrite
+                os.unlink(dst_file)
+                try:
+                    os.link(src_file, dst_file)
+                    return
+                except OSError:
+                    pass
+            except OSError:
+                pass  # e.g. cross-device link; copy instead
+
+        with open(dst_file, "wb") as d:
+            copied = False
+            if fcntl is not None:
+                try:
+                    fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+                    copied = True
+                except OSError:
+                    pass  # Not Btrfs/XFS, or input and output are on different filesystems
+
+            if not copied and hasattr(os, "copy_file_range"):
+                try:
+                    remaining = src_stat.st_size
+                    while remaining > 0:
+                        n = os.copy_file_range(s.fileno(), d.fileno(), remaining)
+                        if n == 0:
+                            break
+                        remaining -= n
+                    copied = remaining == 0  # Anything short is redone below
+                except OSError:
+                    pass
+
+            if not copied:
+                # dst_file may hold part of the data already
+                s.seek(0)
+                d.seek(0)
+                d.truncate()
+                shutil.copyfileobj(s, d, 1024 * 1024)
+
+            if COPYSTAT_BY_FD:
+                d.flush()  # So closing the file doesn't write (and bump the mtime) afterwards
+                copystat_fd(s.fileno(), d.fileno(), src_stat)
+
+    if not COPYSTAT_BY_FD:
+        shutil.copystat(src_file, dst_file)
+
+
+def partial_path(output_file: str) -> str:
+    """
+    Returns the hidden name that output_file is written under until it is complete,
+    metadata included (see process_file), e.g. "dir/.IMG_1.partial.jpg" for "dir/IMG_1.jpg".
+    The extension stays last, since ffmpeg and ImageMagick pick the output format from it.
+    """
+    head, tail = os.path.split(output_file)
+    root, ext = os.path.splitext(tail)
+    return os.path.join(head, f".{root}.partial{ext}")
+
+
+def discard_partial(partial_file: str):
+    """
+    Removes whatever a failed step left under partial_file, if anything.
+    """
+    try:
+        os.unlink(partial_file)
+    except FileNotFoundError:
+        pass
+
+
+def copy_to_partial(src_file: str, partial_file: str, output_file: str, hardlink: bool = False):
+    """
+    Copies (or hard-links) src_file to partial_file with fast_copy, to be moved over
+    output_file afterwards. Like fast_copy, raises shutil.SameFileError if output_file is
+    src_file; with hardlink=True such an output_file (a link left by an earlier --hardlink
+    run) is removed instead, since renaming a link over another link to the same file
+    does nothing.
+    """
+    discard_partial(partial_file)  # Left over from an interrupted run
+    try:
+        same_file = os.path.samefile(src_file, output_file)
+    except FileNotFoundError:
+        same_file = False
+    if same_file:
+        if not hardlink:
+            raise shutil.SameFileError(f"{src_file!r} and {output_file!r} are the same file")
+        os.unlink(output_file)
+    fast_copy(src_file, partial_file, hardlink)
+
+
+def copystat_fd(src_fd: int, dst_fd: int, src_stat: os.stat_result):
+    """
+    Does what shutil.copystat does on Linux (copies the access/modification times,
+    extended attributes and permission bits) between two open files, so no path has
+    to be looked up again. src_stat is os.fstat(src_fd).
+    Like copystat, it ignores xattrs that can't be read or set on these filesystems.
+    """
+    os.utime(dst_fd, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+    try:
+        names = os.listxattr(src_fd)
+    except OSError as e:
+        if e.errno not in (errno.ENOTSUP, errno.ENODATA, errno.EINVAL):
+            raise
+        names = []
+    for name in names:
+        try:
+            os.setxattr(dst_fd, name, os.getxattr(src_fd, name))
+        except OSError as e:
+            if e.errno not in (errno.EPERM, errno.ENOTSUP, errno.ENODATA, errno.EINVAL):
+                raise
+    os.chmod(dst_fd, stat.S_IMODE(src_stat.st_mode))
 
 # --------------------------
 # Metadata Functions
 # --------------------------
 
 
-def update_metadata_with_exiftool(target_file: Path, metadata: dict):
+class ExifToolDaemon:
     """
-    Uses ExifTool to update metadata in the target file based on JSON data.
-    Expected fields include timestamps (from 'photoTakenTime' or 'creationTime'),
-    GPS data, and an optional description.
+    The ExifTool process (`-stay_open True -@ -`) that runs a whole run's metadata
+    batches (see run_exiftool_batch). Each command is a list of bytes arguments (the
+    B_* constants and os.fsencode'd paths) written as argfile lines and ended with
+    `-execute`; ExifTool answers with the command's output, its status and `{ready}`.
+    Requires ExifTool 12.10+ (for `${status}` in -echo3).
     """
-    exiftool_args = ["exiftool", "-overwrite_original"]
 
-    # Timestamp update (if available)
+    def __init__(self):
+        self.process = self._start()
+
+    @staticmethod
+    def _start() -> subprocess.Popen:
+        return subprocess.Popen(
+            [EXIFTOOL_BIN, "-stay_open", "True", "-@", "-"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            # Error messages end up in the command's output, ahead of the status line
+            stderr=subprocess.STDOUT
+        )
+
+    def _send(self, args: list):
+        """
+        Writes one command to ExifTool's stdin (without flushing).
+        """
+        lines = []
+        for arg in args:
+            if b"\n" in arg or b"\r" in arg:
+                # Argfile lines can't hold newlines, but "#[CSTR]" lines accept C escapes
+                arg = b"#[CSTR]" + arg.replace(b"\\", b"\\\\").replace(
+                    b"\r", b"\\r").replace(b"\n", b"\\n")
+            lines.append(arg)
+        lines.append(B_STATUS_AND_EXECUTE)
+        self.process.stdin.write(b"\n".join(lines))
+
+    def _receive(self) -> tuple:
+        """
+        Reads the output of the oldest outstanding command, up to its `{ready}` marker.
+        The output is decoded for logging.
+        """
+        output = []
+        while True:
+            line = self.process.stdout.readline()
+            if not line:
+                raise RuntimeError("ExifTool exited unexpectedly")
+            line = line.rstrip(b"\r\n")
+            if line == b"{ready}":
+                break
+            output.append(line)
+
+        status = output.pop() if output else b""
+        return ((int(status) if status.isdigit() else 1),
+                b"\n".join(output).decode("utf-8", "surrogateescape"))
+
+    def run(self, args: list) -> tuple:
+        """
+        Runs a single ExifTool command (`args` without the leading "exiftool")
+        and returns (exit_status, output).
+        """
+        self._send(args)
+        self.process.stdin.flush()
+        return self._receive()
+
+    def run_batch(self, commands: list):
+        """
+        Runs many ExifTool commands, writing EXIFTOOL_BATCH_SIZE of them at a time
+        before reading any results back, so the files don't each wait for a full
+        round trip. Yields one (exit_status, output) per command, in order, so a
+        caller knows how far it got if ExifTool dies part way (see restart).
+        The chunks keep ExifTool's pending output far below the pipe capacity,
+        so neither side can block the other.
+        """
+        for start in range(0, len(commands), EXIFTOOL_BATCH_SIZE):
+            chunk = commands[start:start + EXIFTOOL_BATCH_SIZE]
+            for args in chunk:
+                self._send(args)
+            self.process.stdin.flush()
+            for _ in chunk:
+                yield self._receive()
+
+    def restart(self):
+        """
+        Replaces the ExifTool process, e.g. after it died, with a fresh one.
+        """
+        self.process.kill()
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass  # Unwritten commands can't be flushed into a broken pipe
+        self.process.stdout.close()
+        self.process.wait()
+        self.process = self._start()
+
+    def close(self):
+        """
+        Tells ExifTool to leave stay_open mode and waits for it to exit.
+        """
+        if self.process.poll() is None:
+            self.process.stdin.write(b"-stay_open\nFalse\n")
+            self.process.stdin.close()
+            self.process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def sidecar_fields(target_file: str, metadata: dict) -> tuple:
+    """
+    Extracts the fields we write from a JSON sidecar:
+    (epoch_time, date_str, latitude, longitude, description).
+    The timestamp comes from 'photoTakenTime' or 'creationTime'; any missing field is None,
+    and the GPS position is None unless it is away from (0, 0).
+    """
+    epoch_time = date_str = None
     photo_timestamp = (metadata.get('photoTakenTime', {}).get('timestamp') or
                        metadata.get('creationTime', {}).get('timestamp'))
     if photo_timestamp:
         try:
             epoch_time = int(photo_timestamp)
-            utc_time = datetime.datetime.utcfromtimestamp(epoch_time)
-            date_str = utc_time.strftime("%Y:%m:%d %H:%M:%S")
-            exiftool_args.extend([
-                f"-DateTimeOriginal={date_str}",
-                f"-CreateDate={date_str}",
-                f"-ModifyDate={date_str}"
-            ])
-        except ValueError:
+            utc_time = datetime.datetime.fromtimestamp(epoch_time, tz=datetime.timezone.utc)
+            date_str = utc_time.strftime(EXIF_DATE_FORMAT)
+        except (ValueError, OverflowError, OSError):  # Not a number, or out of range
+            epoch_time = None
             logger.warning(
                 f"Unable to parse timestamp {photo_timestamp} for {target_file}")
 
-    # GPS Data update
     geo_data = metadata.get('geoData') or metadata.get('geoDataExif') or {}
     latitude = geo_data.get('latitude')
     longitude = geo_data.get('longitude')
-    if latitude is not None and longitude is not None and (abs(latitude) > 0.00001 or abs(longitude) > 0.00001):
-        exiftool_args.append(f"-GPSLatitude={latitude}")
-        exiftool_args.append(f"-GPSLongitude={longitude}")
+    if latitude is None or longitude is None or not (abs(latitude) > 0.00001 or abs(longitude) > 0.00001):
+        latitude = longitude = None
+
+    return epoch_time, date_str, latitude, longitude, metadata.get('description') or None
+
+
+def _gps_rational(value: float) -> tuple:
+    """
+    Converts a coordinate in degrees to the EXIF (degrees, minutes, seconds) rationals,
+    with seconds to 1/10000.
+    """
+    ticks = round(abs(value) * 36000000)
+    degrees, ticks = divmod(ticks, 36000000)
+    minutes, ticks = divmod(ticks, 600000)
+    return (degrees, 1), (minutes, 1), (ticks, 10000)
+
+
+def write_jpeg_metadata(target_file: str, fields: tuple) -> bool:
+    """
+    Writes the same tags as metadata_update_args, from the sidecar_fields tuple `fields`,
+    into a JPEG in-process with piexif, keeping the rest of its Exif data, and sets the
+    file's modification time to the photo's timestamp.
+    Returns False (having changed nothing) if piexif isn't installed, the file isn't a
+    JPEG, its Exif data can't be round-tripped, or it has a MakerNote (whose internal
+    offsets piexif would break by moving it); the caller then falls back to ExifTool.
+    """
+    if piexif is None or os.path.splitext(target_file)[1].lower() not in (".jpg", ".jpeg"):
+        return False
+
+    epoch_time, date_str, latitude, longitude, description = fields
+    # Written to a new file that replaces the old one, as ExifTool does, so a
+    # --hardlink output is never updated in place (which would alter the input too)
+    temp_file = f"{target_file}.piexif_tmp"
+    try:
+        with open(target_file, "rb") as f:
+            # piexif works on the bytes, so the file is only read once
+            data = f.read()
+            exif_dict = piexif.load(data)
+            if piexif.ExifIFD.MakerNote in exif_dict["Exif"]:
+                logger.debug(f"{target_file} has a MakerNote; using ExifTool")
+                return False
+            if date_str:
+                date_bytes = date_str.encode("ascii")
+                exif_dict["Exif"][piexif.ExifIFD.DateTimeOriginal] = date_bytes
+                exif_dict["Exif"][piexif.ExifIFD.DateTimeDigitized] = date_bytes  # CreateDate
+                exif_dict["0th"][piexif.ImageIFD.DateTime] = date_bytes           # ModifyDate
+            if latitude is not None:
+                gps = exif_dict["GPS"]
+                gps.setdefault(piexif.GPSIFD.GPSVersionID, (2, 3, 0, 0))
+                gps[piexif.GPSIFD.GPSLatitude] = _gps_rational(latitude)
+                gps[piexif.GPSIFD.GPSLatitudeRef] = b"N" if latitude >= 0 else b"S"
+                gps[piexif.GPSIFD.GPSLongitude] = _gps_rational(longitude)
+                gps[piexif.GPSIFD.GPSLongitudeRef] = b"E" if longitude >= 0 else b"W"
+            if description:
+                exif_dict["0th"][piexif.ImageIFD.ImageDescription] = description.encode("utf-8")
+            updated = io.BytesIO()
+            piexif.insert(piexif.dump(exif_dict), data, updated)
+
+            with open(temp_file, "wb") as tf:
+                tf.write(updated.getbuffer())
+                # Keep the mode and xattrs fast_copy gave the file (the times are set below)
+                if COPYSTAT_BY_FD:
+                    tf.flush()
+                    copystat_fd(f.fileno(), tf.fileno(), os.fstat(f.fileno()))
+        if not COPYSTAT_BY_FD:
+            shutil.copystat(target_file, temp_file)
+        os.replace(temp_file, target_file)
+        if epoch_time is not None:
+            os.utime(target_file, (epoch_time, epoch_time))
+    except Exception as e:
+        discard_partial(temp_file)
+        logger.debug(f"piexif can't update {target_file} ({e}); using ExifTool")
+        return False
+    logger.debug(f"Metadata updated for {target_file}")
+    return True
+
+
+def metadata_update_args(target_file: str, fields: tuple) -> list:
+    """
+    Builds the ExifTool arguments (as bytes) that update metadata in the target file from
+    the sidecar_fields tuple `fields`, including the file's modification time.
+    The command is not run here; see run_exiftool_batch.
+    """
+    exiftool_args = [B_OVERWRITE]
+    epoch_time, date_str, latitude, longitude, description = fields
+
+    # Timestamp update (if available)
+    if date_str:
+        date_bytes = date_str.encode("ascii")
+        exiftool_args.extend([
+            B_DATE_TIME_ORIGINAL + date_bytes,
+            B_CREATE_DATE + date_bytes,
+            B_MODIFY_DATE + date_bytes,
+            B_FILE_MODIFY_DATE + date_bytes + b"+00:00"
+        ])
+
+    # GPS Data update
+    if latitude is not None:
+        exiftool_args.append(B_GPS_LATITUDE + str(latitude).encode("ascii"))
+        exiftool_args.append(B_GPS_LONGITUDE + str(longitude).encode("ascii"))
         exiftool_args.append(
-            f"-GPSLatitudeRef={'N' if latitude >= 0 else 'S'}")
+            b"-GPSLatitudeRef=N" if latitude >= 0 else b"-GPSLatitudeRef=S")
         exiftool_args.append(
-            f"-GPSLongitudeRef={'E' if longitude >= 0 else 'W'}")
+            b"-GPSLongitudeRef=E" if longitude >= 0 else b"-GPSLongitudeRef=W")
 
     # Optional description/caption
-    description = metadata.get('description')
     if description:
-        exiftool_args.append(f"-ImageDescription={description}")
+        exiftool_args.append(B_IMAGE_DESCRIPTION + str(description).encode("utf-8"))
 
-    exiftool_args.append(str(target_file))
-    logger.info(f"Updating metadata on: {target_file}")
-    try:
-        result = subprocess.run(exiftool_args, capture_output=True, text=True)
-        if result.returncode != 0:
-            logger.error(
-                f"ExifTool error for {target_file}: {result.stderr.strip()}")
-        else:
-            logger.info(f"Metadata updated for {target_file}")
-    except Exception as e:
-        logger.error(f"Failed to run ExifTool for {target_file}: {e}")
+    exiftool_args.append(os.fsencode(target_file))
+    logger.debug(f"Queued metadata update for: {target_file}")
+    return exiftool_args
 
 
-def copy_metadata(src_file: Path, dst_file: Path) -> bool:
+def metadata_copy_args(src_file: str, dst_file: str) -> list:
     """
-    Copies metadata from src_file to dst_file using ExifTool.
+    Builds the ExifTool arguments (as bytes) that copy metadata from src_file to dst_file.
     This is used when no JSON sidecar is available.
+    Orientation is left out, as the HEIC conversion has already rotated the pixels.
+    The command is not run here; see run_exiftool_batch.
     """
-    logger.info(f"Copying metadata from {src_file} to {dst_file}")
-    try:
-        subprocess.run([
-            "exiftool",
-            "-overwrite_original",
-            "-TagsFromFile", str(src_file),
-            "-All:All",
-            str(dst_file)
-        ], check=True)
-        return True
-    except subprocess.CalledProcessError as e:
-        logger.error(
-            f"Metadata copy failed from {src_file} to {dst_file}: {e}")
-        return False
+    logger.debug(f"Queued metadata copy from {src_file} to {dst_file}")
+    return [
+        B_OVERWRITE,
+        B_TAGS_FROM_FILE, os.fsencode(src_file),
+        B_ALL_TAGS,
+        B_NOT_ORIENTATION,
+        os.fsencode(dst_file)
+    ]
 
 
-def find_corresponding_json(media_file: Path) -> Path:
+def run_exiftool_batch(daemon: ExifToolDaemon, commands: list) -> list:
     """
-    Looks for a JSON sidecar for the given media file.
-    It checks for both 'File.ext.json' and 'File.json' patterns.
+    Runs a batch of queued ExifTool commands through daemon. Each command is
+    (exiftool_args, partial_file, output_file), as returned by process_file; once it has
+    succeeded, partial_file is moved over output_file. When a command fails, or ExifTool dies
+    on it, the partial file is removed instead, so the next run processes the file again;
+    if ExifTool died it is restarted for the rest of the batch.
+    Failures are logged one by one. Returns the exit status of each command, in order,
+    or None for those given up.
     """
-    json_candidate1 = media_file.with_suffix(media_file.suffix + ".json")
-    if json_candidate1.exists():
-        return json_candidate1
-    json_candidate2 = media_file.with_suffix(".json")
-    if json_candidate2.exists():
-        return json_candidate2
-    return None
+    statuses = []
+    while len(statuses) < len(commands):
+        remaining = commands[len(statuses):]
+        try:
+            results = daemon.run_batch([exiftool_args for exiftool_args, _, _ in remaining])
+            for (_, partial_file, output_file), (status, output) in zip(remaining, results):
+                if status != 0:
+                    logger.error(f"ExifTool error for {output_file}: {output.strip()}")
+                    discard_partial(partial_file)
+                    statuses.append(status)
+                    continue
+                try:
+                    os.replace(partial_file, output_file)
+                except OSError as e:
+                    logger.error(f"Failed to move {partial_file} to {output_file}: {e}")
+                    discard_partial(partial_file)
+                    status = None
+                statuses.append(status)
+        except (RuntimeError, OSError) as e:  # ExifTool exited, or its pipe broke
+            _, partial_file, output_file = commands[len(statuses)]
+            logger.error(f"ExifTool died while updating {output_file} ({e}); restarting it")
+            discard_partial(partial_file)
+            statuses.append(None)
+            try:
+                daemon.restart()
+            except OSError as e:
+                logger.error(f"Failed to restart ExifTool: {e}")
+                for _, partial_file, _ in commands[len(statuses):]:
+                    discard_partial(partial_file)
+                statuses.extend([None] * (len(commands) - len(statuses)))
+    return statuses
 
-# --------------------------
-# Processing Each File
-# --------------------------
+
+def find_corresponding_json(media_path: str, sidecars: dict) -> str:
+    """
+    Looks for a JSON sidecar for the given media file in `sidecars`, the index of
+    its directory's .json files built by iter_media (no filesystem access).
+    It checks for both 'File.ext.json' and 'File.json' patterns.
+    """
+    return sidecars.get(media_path) or sidecars.get(os.path.splitext(media_path)[0])
 
 
-def process_file(file_path: Path, input_dir: Path, output_dir: Path) -> bool:
+def iter_media(root):
     """
-    Processes a single media file:
-      - Determines relative path to preserve folder structure.
-      - Converts the file if needed (HEIC->JPG or MOV/AVI->MP4) or copies it as is.
-      - Updates metadata using a JSON sidecar if available, otherwise copies metadata from the original if conversion was performed.
-    Returns True if the file was processed successfully.
+    Recursively yields (media_path, ext, json_sidecar) for every supported media file under root,
+    where ext is the lowercased extension without the dot (see MEDIA_EXTS) and json_sidecar
+    is the sidecar's path or None (all paths are plain strings).
+    Each directory is listed once with os.scandir, files are filtered on their name alone,
+    and sidecars are looked up in the same listing. Directories that can't be listed are
+    skipped, and symlinked ones (which could loop or duplicate outputs) aren't followed.
     """
-    try:
-        rel_path = file_path.relative_to(input_dir)
-    except ValueError as e:
-        logger.error(f"Error computing relative path for {file_path}: {e}")
-        return False
+    stack = [os.fspath(root)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                entries = list(it)
+        except OSError:
+            continue
 
-    # Initialize output file path (will be adjusted if conversion is needed)
-    output_file = output_dir / rel_path
-    output_file.parent.mkdir(parents=True, exist_ok=True)
+        # JSON sidecars in this directory, keyed by their path without ".json"
+        sidecars = {}
+        media = []
+        for entry in entries:
+            if entry.is_dir():
+                if not entry.is_symlink():
+                    stack.append(entry.path)
+                continue
 
-    ext = file_path.suffix.lower()
-    conversion_performed = False
+            name = entry.name
+            if name.endswith(".json"):
+                sidecars[entry.path[:-5]] = entry.path
+                continue
+
+            # As with Path.suffix, a leading dot alone (".jpg") is not an extension
+            dot = name.rfind('.')
+            if dot <= 0:
+                continue
+            ext = name[dot + 1:].lower()
+            if ext not in MEDIA_EXTS:
+                continue
+            media.append((entry.path, ext))
+
+        for media_path, ext in media:
+            yield media_path, ext, find_corresponding_json(media_path, sidecars)
+
+# --------------------------
+# Processing Each File
+# --------------------------
 
-    # Determine if conversion is needed.
-    if ext == ".heic":
-        output_file = output_file.with_suffix(".jpg")
-        if not convert_heic_to_jpg(file_path, output_file):
-            return False
-        conversion_performed = True
-    elif ext in {".mov", ".avi"}:
-        output_file = output_file.with_suffix(".mp4")
-        if not convert_video_to_mp4(file_path, output_file):
-            return False
-        conversion_performed = True
-    else:
-        # No conversion needed: simply copy the file.
-        try:
-            shutil.copy2(file_path, output_file)
-        except Exception as e:
-            logger.error(f"Error copying {file_path} to {output_file}: {e}")
-            return False
 
-    # Check for a corresponding JSON sidecar.
-    json_sidecar = find_corresponding_json(file_path)
-    if json_sidecar and json_sidecar.exists():
+def metadata_step(file_path: str, json_sidecar: str, output_file: str,
+                  conversion_performed: bool) -> list:
+    """
+    Applies or queues the metadata step for a processed file: updates it using json_sidecar
+    if available, otherwise copies metadata from the original if conversion was performed.
+    JPEG updates are written right away (see write_jpeg_metadata); anything else is
+    returned as ExifTool arguments for the shared batch, or None if there is nothing to do.
+    """
+    if json_sidecar:
         try:
-            with open(json_sidecar, "r", encoding="utf-8") as jf:
-                metadata = json.load(jf)
+            with open(json_sidecar, "rb") as jf:
+                metadata = json_loads(jf.read())
             # If the JSON sidecar is an array, use the first element.
             if isinstance(metadata, list) and metadata:
                 metadata = metadata[0]
         except Exception as e:
             logger.warning(f"Could not parse JSON {json_sidecar}: {e}")
             metadata = {}
-        update_metadata_with_exiftool(output_file, metadata)
+        # Extracted once for both writers, so any warning is logged once
+        fields = sidecar_fields(file_path, metadata)
+        if write_jpeg_metadata(output_file, fields):
+            return None
+        return metadata_update_args(output_file, fields)
     else:
         # No JSON sidecar: if conversion was performed, attempt to copy metadata from original.
         if conversion_performed:
-            copy_metadata(file_path, output_file)
+            return metadata_copy_args(file_path, output_file)
+        logger.debug(
+            f"No JSON sidecar found for {file_path}. Preserving original metadata.")
+        return None
+
+
+def output_is_current(file_path: str, json_sidecar: str, output_file: str) -> bool:
+    """
+    Returns True if output_file exists, isn't empty and was written after the last change
+    to file_path and to its JSON sidecar (if any), i.e. an earlier run already produced it.
+    Outputs only get their final name once their metadata step has succeeded (see
+    process_file and run_exiftool_batch); whatever a failed or interrupted run leaves
+    behind is removed or still has its partial name, so it never counts.
+    """
+    try:
+        output_stat = os.stat(output_file)
+        newest_input = os.stat(file_path).st_mtime
+        if json_sidecar:
+            newest_input = max(newest_input, os.stat(json_sidecar).st_mtime)
+    except OSError:
+        return False
+    # The metadata step sets the output's mtime to the photo's own date, which is usually
+    # older than the input file, so the inode change time (when the output was last
+    # written or touched) counts as well
+    return (output_stat.st_size > 0 and
+            max(output_stat.st_mtime, output_stat.st_ctime) >= newest_input)
+
+
+async def process_file(file_path: str, ext: str, json_sidecar: str, input_prefix: str, output_root: str,
+                       video_slots: asyncio.Semaphore, preset: str = DEFAULT_X264_PRESET,
+                       video_encoder=None, hardlink: bool = False,
+                       hw_slots: asyncio.Semaphore = None) -> tuple:
+    """
+    Processes a single media file:
+      - Determines relative path to preserve folder structure.
+      - Converts the file if needed (HEIC->JPG or MOV/AVI->MP4) or copies it as is
+        (hard-linking it instead if hardlink is set; see fast_copy).
+      - Handles its metadata (see metadata_step), with ext and json_sidecar as found by iter_media.
+    Video conversions use the hardware encoder returned by awaiting video_encoder() (None for
+    libx264; see process_directory), waiting for one of hw_slots, and fall back to libx264
+    if it fails; libx264 encodes wait for one of video_slots. The blocking in-process work (HEIC
+    decoding, copying, JPEG metadata) runs in a thread so the event loop stays free.
+    The output is written under partial_path(output_file) and only moved over output_file
+    once the metadata step is done; on failure the partial file is removed.
+    The ExifTool step is returned rather than run, so files share ExifTool batches,
+    which also move the files into place (see run_exiftool_batch).
+    Files whose output is already up to date (see output_is_current) are skipped.
+    Paths are plain strings; file_path comes from iter_media, so it starts with input_prefix
+    (the input folder with a trailing separator) and its name has an extension.
+    Returns (success, exiftool_command), where exiftool_command is None if no ExifTool step is
+    needed, or else (exiftool_args, partial_file, output_file).
+    """
+    # Output file path, with the extension of the converted format if conversion is needed
+    output_file = os.path.join(output_root, file_path[len(input_prefix):])
+    if ext == "heic":
+        output_file = output_file[:-len(ext)] + "jpg"
+    elif ext in {"mov", "avi"}:
+        output_file = output_file[:-len(ext)] + "mp4"
+
+    if output_is_current(file_path, json_sidecar, output_file):
+        logger.debug(f"Skipping {file_path}: {output_file} is up to date")
+        return True, None
+    output_parent = os.path.dirname(output_file)
+    if output_parent not in CREATED_DIRS:
+        os.makedirs(output_parent, exist_ok=True)
+        CREATED_DIRS.add(output_parent)
+
+    partial_file = partial_path(output_file)
+    conversion_performed = False
+    try:
+        # Determine if conversion is needed.
+        if ext == "heic":
+            success = await asyncio.to_thread(convert_heic_to_jpg, file_path, partial_file)
+            conversion_performed = True
+        elif ext in {"mov", "avi"}:
+            hw_encoder = await video_encoder() if video_encoder else None
+            success = False
+            if hw_encoder:
+                async with hw_slots:
+                    success = await convert_video_to_mp4(file_path, partial_file, preset, hw_encoder)
+                if not success:
+                    logger.warning(f"Retrying {file_path} with libx264")
+            if not success:
+                async with video_slots:
+                    success = await convert_video_to_mp4(file_path, partial_file, preset)
+            conversion_performed = True
         else:
-            logger.info(
-                f"No JSON sidecar found for {file_path}. Preserving original metadata.")
+            # No conversion needed: simply copy the file.
+            try:
+                await asyncio.to_thread(copy_to_partial, file_path, partial_file, output_file, hardlink)
+                success = True
+            except Exception as e:
+                logger.error(f"Error copying {file_path} to {output_file}: {e}")
+                success = False
+        if not success:
+            discard_partial(partial_file)
+            return False, None
 
-    return True
+        exiftool_args = await asyncio.to_thread(
+            metadata_step, file_path, json_sidecar, partial_file, conversion_performed)
+        if exiftool_args is None:
+            os.replace(partial_file, output_file)
+            return True, None
+    except Exception:
+        discard_partial(partial_file)
+        raise
+    return True, (exiftool_args, partial_file, output_file)
 
 # --------------------------
-# Processing Directory with Multi-threading
+# Processing Directory with asyncio
 # --------------------------
 
 
-def process_directory(input_dir: Path, output_dir: Path):
+async def process_directory(input_dir: Path, output_dir: Path, preset: str = DEFAULT_X264_PRESET,
+                            hardlink: bool = False, use_hw_encoder: bool = True):
     """
-    Walks through input_dir recursively and processes each media file using a thread pool.
+    Walks through input_dir recursively (see iter_media) and processes the media files
+    concurrently in a single asyncio event loop.
+    ExifTool commands are run EXIFTOOL_BATCH_SIZE at a time by one long-lived daemon
+    while the other files are processed, so an interrupted run keeps the metadata (and
+    outputs) of every batch done so far; files count as processed once their batch ran.
     A final report is printed at the end.
     """
     total_files = 0
     processed_files = 0
     failed_files = []
-    extension_map = defaultdict(int)
-
-    # Use a controlled number of worker threads (e.g., 4)
-    max_workers = 4
-    futures = {}
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        for root, dirs, files in os.walk(input_dir):
-            for fname in files:
-                file_path = Path(root) / fname
-                if file_path.suffix.lower() in SUPPORTED_MEDIA_EXTENSIONS:
-                    total_files += 1
-                    logger.info(f"Submitting file for processing: {file_path}")
-                    future = executor.submit(
-                        process_file, file_path, input_dir, output_dir)
-                    futures[future] = file_path
-
-        for future in as_completed(futures):
-            file_path = futures[future]
+    # Failed files whose output was dropped because ExifTool couldn't update its metadata
+    metadata_failed = []
+    # Extension (from iter_media, so lowercase and without the dot) of every processed file
+    processed_exts = []
+
+    # Encodes are CPU- or GPU-bound and ffmpeg runs with "-threads 2",
+    # so one ffmpeg per two cores keeps the machine busy without oversubscribing it
+    video_slots = asyncio.Semaphore(max(1, (os.cpu_count() or 2) // 2))
+    # Hardware encodes are limited by the GPU instead (see HW_ENCODE_SLOTS)
+    hw_slots = asyncio.Semaphore(HW_ENCODE_SLOTS)
+    # A fixed set of workers rather than one task per file keeps memory flat on huge trees;
+    # as many as the default thread pool has threads, so their in-process work never queues
+    num_workers = min(32, (os.cpu_count() or 1) + 4)
+    # Every path below is a plain string built from these two
+    input_prefix = os.path.join(os.fspath(input_dir), "")
+    output_root = os.fspath(output_dir)
+    # The hardware encoder probe runs ffmpeg up to four times, so it only starts once the
+    # first video turns up (and never without use_hw_encoder); other videos wait for its result
+    hw_encoder_probe = None
+
+    async def video_encoder():
+        nonlocal hw_encoder_probe
+        if not use_hw_encoder:
+            return None
+        if hw_encoder_probe is None:
+            hw_encoder_probe = asyncio.ensure_future(asyncio.to_thread(detect_hw_encoder))
+        return await hw_encoder_probe
+
+    # (file_path, ext, exiftool_command) of the files waiting for the next ExifTool batch
+    exiftool_queue = []
+    # The daemon runs one batch at a time
+    exiftool_lock = asyncio.Lock()
+    media_files = iter_media(input_dir)
+
+    async def flush_exiftool(daemon: ExifToolDaemon):
+        nonlocal processed_files
+        batch = exiftool_queue.copy()
+        exiftool_queue.clear()
+        async with exiftool_lock:
+            logger.debug(f"Running {len(batch)} ExifTool commands")
+            statuses = await asyncio.to_thread(
+                run_exiftool_batch, daemon, [exiftool_command for _, _, exiftool_command in batch])
+        for (file_path, ext, _), status in zip(batch, statuses):
+            if status == 0:
+                processed_files += 1
+                processed_exts.append(ext)
+                continue
+            failed_files.append(file_path)
+            if status is not None:
+                metadata_failed.append(file_path)
+
+    # Files the workers are done with, including those waiting for their ExifTool batch
+    files_done = 0
+
+    async def worker(daemon: ExifToolDaemon):
+        nonlocal total_files, processed_files, files_done
+        # The workers share one iterator; each next() runs without interruption
+        for file_path, ext, json_sidecar in media_files:
+            total_files += 1
+            logger.debug(f"Processing file: {file_path}")
             try:
-                success = future.result()
-                ext = file_path.suffix.lower()
-                if success:
+                success, exiftool_command = await process_file(
+                    file_path, ext, json_sidecar, input_prefix, output_root, video_slots, preset,
+                    video_encoder, hardlink, hw_slots)
+                if exiftool_command:
+                    exiftool_queue.append((file_path, ext, exiftool_command))
+                    if len(exiftool_queue) >= EXIFTOOL_BATCH_SIZE:
+                        await flush_exiftool(daemon)
+                elif success:
                     processed_files += 1
-                    extension_map[ext] += 1
+                    processed_exts.append(ext)
                 else:
-                    failed_files.append(str(file_path))
+                    failed_files.append(file_path)
             except Exception as exc:
                 logger.error(f"Error processing {file_path}: {exc}")
-                failed_files.append(str(file_path))
+                failed_files.append(file_path)
+
+            files_done += 1
+            if files_done % PROGRESS_EVERY == 0:
+                logger.info(f"Progress: {files_done} files done, {len(failed_files)} failed")
+
+    with ExifToolDaemon() as daemon:
+        await asyncio.gather(*(worker(daemon) for _ in range(num_workers)))
+        if exiftool_queue:
+            await flush_exiftool(daemon)
 
     # Generate a final report.
-    report_lines = [
+    # Only the summary goes to the log; the list of failed files, which can be huge,
+    # is streamed straight into the report file.
+    summary_lines = [
         "=== FINAL REPORT ===",
         f"Input Directory : {input_dir.resolve()}",
         f"Output Directory: {output_dir.resolve()}",
         f"Total media files found : {total_files}",
         f"Successfully processed  : {processed_files}",
         f"Failed                  : {total_files - processed_files}",
+        f"Failed on ExifTool      : {len(metadata_failed)}",
         "",
         "File types processed:"
     ]
+    # Counter tallies the whole list in C
+    extension_map = Counter(processed_exts)
     for ext, count in sorted(extension_map.items()):
-        report_lines.append(f"  {ext} : {count}")
-    if failed_files:
-        report_lines.append("\nFiles that failed to process:")
-        for f in failed_files:
-            report_lines.append(f"  {f}")
-    else:
-        report_lines.append("\nNo files failed.")
-    report_text = "\n".join(report_lines)
-    logger.info("\n" + report_text)
+        summary_lines.append(f"  .{ext} : {count}")
+    logger.info("\n" + "\n".join(summary_lines))
 
     # Optionally, write the report to a file in the output directory.
     try:
         report_path = output_dir / "report.txt"
         with open(report_path, "w", encoding="utf-8") as rf:
-            rf.write(report_text)
+            rf.writelines(line + "\n" for line in summary_lines)
+            if failed_files:
+                rf.write("\nFiles that failed to process:\n")
+                rf.writelines(f"  {f}\n" for f in failed_files)
+            else:
+                rf.write("\nNo files failed.\n")
+            if metadata_failed:
+                rf.write("\nFailed files whose metadata ExifTool could not update (see its errors):\n")
+                rf.writelines(f"  {f}\n" for f in metadata_failed)
         logger.info(f"Report written to: {report_path.resolve()}")
     except Exception as e:
         logger.error(f"Failed to write report: {e}")
@@ -345,7 +1044,20 @@ def main():
                         help="Path to the input folder containing media files.")
     parser.add_argument("--output_folder", type=str, default="output",
                         help="Path to the output folder (default: ./output).")
+    parser.add_argument("--preset", type=str, default=DEFAULT_X264_PRESET,
+                        choices=X264_PRESETS,
+                        help=f"x264 preset used for video conversion (default: {DEFAULT_X264_PRESET}). "
+                             "Only applies to libx264, not to a hardware encoder (see --no-hw-encoder).")
+    parser.add_argument("--no-hw-encoder", action="store_true",
+                        help="Always encode videos with libx264, even if a hardware H.264 encoder is available.")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="Log every file as it is processed.")
+    parser.add_argument("--hardlink", action="store_true",
+                        help="Hard-link files that need no conversion into the output folder instead of copying them "
+                             "(input and output must be on the same filesystem).")
     args = parser.parse_args()
+    if args.verbose:
+        logger.setLevel(logging.DEBUG)
 
     input_dir = Path(args.input_folder)
     output_dir = Path(args.output_folder)
@@ -354,7 +1066,18 @@ def main():
         logger.error(f"Error: {input_dir} is not a valid directory.")
         sys.exit(1)
 
-    process_directory(input_dir, output_dir)
+    # ImageMagick is only needed when HEIC files can't be decoded in-process
+    required_tools = {"ffmpeg": FFMPEG_BIN, "exiftool": EXIFTOOL_BIN}
+    if pillow_heif is None:
+        required_tools["magick"] = MAGICK_BIN
+    missing = [name for name, path in required_tools.items() if path is None]
+    if missing:
+        logger.error(
+            f"{', '.join(missing)} not found in PATH. Please install them and add them to your PATH.")
+        sys.exit(1)
+
+    asyncio.run(process_directory(input_dir, output_dir, args.preset, args.hardlink,
+                                  not args.no_hw_encoder))
 
 
 if __name__ == "__main__":